@@ -1,18 +1,33 @@
+import numpy as np
 import pandas as pd
 import requests
-import json
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import orjson
+import os
+import asyncio
+import inspect
+import atexit
 import time
 import ccxt
+import ccxt.async_support as ccxt_async
+import ccxt.pro as ccxtpro
 import alpaca_trade_api as alpaca
 import logging
+from abc import ABC, abstractmethod
 from enum import Enum
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Callable, ClassVar, Optional, Tuple, Union
 from dataclasses import dataclass
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 import sqlite3
+import threading
+import queue
 
 # OrderType Enum
-OrderType = Enum("OrderType", ["LIMIT", "MARKET"])
+class OrderType(Enum):
+    LIMIT = 1
+    MARKET = 2
 
 @dataclass
 class APIKey:
@@ -24,55 +39,400 @@ class CryptoPrice:
     symbol: str
     price: float
 
+CACHE_DIR = os.path.join(os.path.expanduser("~"), ".crypto_kit_cache")
+
+OHLCV_COLUMNS = ["timestamp", "open", "high", "low", "close", "volume"]
+
+def _ohlcv_to_dataframe(candles: Union[List[List[Any]], np.ndarray], end_timestamp: int) -> pd.DataFrame:
+    # Build the frame column-wise from a single array instead of one dict per candle
+    # (reshape keeps an empty input 2-D, so empty results get the same dtypes)
+    arr = np.asarray(candles, dtype=np.float64).reshape(-1, len(OHLCV_COLUMNS))
+    # Millisecond timestamps are exact in float64, so one cast gives the int64 epoch column
+    timestamps = arr[:, 0].astype(np.int64)
+    m = timestamps < end_timestamp
+    return pd.DataFrame({
+        "timestamp": pd.to_datetime(timestamps[m], unit='ms', utc=True),
+        "open": arr[m, 1],
+        "high": arr[m, 2],
+        "low": arr[m, 3],
+        "close": arr[m, 4],
+        "volume": arr[m, 5]
+    })
+
+def _build_session() -> requests.Session:
+    # Keep-alive connection pool; urllib3 does not retry POST by default, so orders are never resent
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=32, pool_maxsize=32, max_retries=Retry(total=3, backoff_factor=0.2))
+    session.mount('https://', adapter)
+    return session
+
+# Exchange classes and instances, shared so markets and HTTP pools are reused
+_EXCHANGE_CLASS_CACHE: Dict[str, type] = {}
+_EXCHANGE_INSTANCE_CACHE: Dict[Tuple[str, Optional[int]], Any] = {}
+_EXCHANGE_LOCK = threading.Lock()
+
+def _get_exchange(exchange_id: str, credentials: Optional[APIKey] = None) -> Any:
+    key = (exchange_id, hash((credentials.key, credentials.secret)) if credentials else None)
+    with _EXCHANGE_LOCK:
+        exchange = _EXCHANGE_INSTANCE_CACHE.get(key)
+        if exchange is None:
+            exchange_class = _EXCHANGE_CLASS_CACHE.get(exchange_id)
+            if exchange_class is None:
+                exchange_class = _EXCHANGE_CLASS_CACHE[exchange_id] = getattr(ccxt, exchange_id)
+            config = {'apiKey': credentials.key, 'secret': credentials.secret} if credentials else {}
+            exchange = exchange_class(config)
+            exchange.session = _build_session()
+            _EXCHANGE_INSTANCE_CACHE[key] = exchange
+        return exchange
+
+# Market metadata shared by all listeners and order managers, keyed by exchange_id
+_MARKETS_CACHE: Dict[str, dict] = {}
+MARKETS_TTL = 24 * 60 * 60  # seconds
+
+def _load_markets(exchange_id: str, exchange: Any, logger: "BaseLogger", cache_dir: Optional[str] = CACHE_DIR):
+    entry = _MARKETS_CACHE.get(exchange_id)
+    path = os.path.join(cache_dir, f"markets_{exchange_id}.json") if cache_dir else None
+    if entry is None and path and os.path.exists(path):
+        try:
+            with open(path, 'rb') as file:
+                entry = orjson.loads(file.read())
+        except Exception as e:
+            logger.log(f"Error reading markets cache for {exchange_id}: {e}")
+
+    # A malformed entry (older format, hand-edited, truncated) falls back to a fresh load
+    if entry is not None:
+        try:
+            if time.time() - entry['fetched_at'] < MARKETS_TTL:
+                exchange.set_markets(entry['markets'], entry['currencies'])
+                _MARKETS_CACHE[exchange_id] = entry
+                return
+        except Exception as e:
+            logger.log(f"Error restoring markets cache for {exchange_id}: {e}")
+
+    exchange.load_markets()
+    entry = {
+        'fetched_at': time.time(),
+        'markets': exchange.markets,
+        'currencies': exchange.currencies
+    }
+    if path:
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, 'wb') as file:
+                file.write(orjson.dumps(entry, default=str))
+            os.replace(tmp_path, path)
+        except Exception as e:
+            logger.log(f"Error writing markets cache for {exchange_id}: {e}")
+    _MARKETS_CACHE[exchange_id] = entry
+
 # Logging Class
-class Logger:
+def _console_logger() -> logging.Logger:
+    logger = logging.getLogger("TradingLogger")
+    logger.setLevel(logging.INFO)
+
+    # Avoid adding multiple handlers
+    if not logger.handlers:
+        # Console Handler
+        console_handler = logging.StreamHandler()
+        console_handler.setLevel(logging.INFO)
+        console_formatter = logging.Formatter('%(asctime)s - %(message)s')
+        console_handler.setFormatter(console_formatter)
+        logger.addHandler(console_handler)
+    return logger
+
+def _render_message(fmt: str, args: Tuple[Any, ...]) -> str:
+    if not args:
+        return fmt
+    try:
+        return fmt % args
+    except (TypeError, ValueError):
+        return f"{fmt} {args}"
+
+# Arguments of these types cannot change between info() and the writer thread rendering them
+_IMMUTABLE_ARG_TYPES = (str, int, float, type(None))
+
+def _format_message(message: Any) -> str:
+    # Non-string payloads (dicts, dataclasses, API responses) are stored as compact JSON
+    if isinstance(message, str):
+        return message
+    return orjson.dumps(message, default=str, option=orjson.OPT_SERIALIZE_NUMPY).decode()
+
+class BaseLogger(ABC):
+    # Console logging plus the logs table schema shared by every logger backend
+    _CREATE_TABLE_SQL: ClassVar[str] = '''CREATE TABLE IF NOT EXISTS logs (
+                            id INTEGER PRIMARY KEY,
+                            timestamp TEXT,
+                            message TEXT)'''
+    _CREATE_INDEX_SQL: ClassVar[str] = "CREATE INDEX IF NOT EXISTS idx_logs_ts ON logs(timestamp)"
+    _INSERT_SQL: ClassVar[str] = "INSERT INTO logs (timestamp, message) VALUES (datetime(?, 'unixepoch'), ?)"
+
+    logger: logging.Logger
+    db_path: str
+
+    def log(self, message: Any):
+        message = _format_message(message)
+        self.logger.info(message)
+        self._log_to_database(message)
+
+    def info(self, fmt: str, *args: Any):
+        # %-style formatting is deferred: the console handler and the writer thread format on demand
+        self.logger.info(fmt, *args)
+        if not all(isinstance(arg, _IMMUTABLE_ARG_TYPES) for arg in args):
+            # A mutable arg changed after the call must not change the stored row
+            fmt, args = _render_message(fmt, args), ()
+        self._log_to_database(fmt, args)
+
+    @abstractmethod
+    def _log_to_database(self, message: str, args: Tuple[Any, ...] = ()):
+        ...
+
+    @abstractmethod
+    def flush(self):
+        ...
+
+    @abstractmethod
+    def close(self):
+        ...
+
+class Logger(BaseLogger):
+    _QUEUE_SIZE = 10000
+    _BATCH_SIZE = 500
+    _FLUSH_INTERVAL = 0.02  # seconds
+
     def __init__(self, db_path: str = "logs.db"):
-        self.logger = logging.getLogger("TradingLogger")
-        self.logger.setLevel(logging.INFO)
-
-        # Avoid adding multiple handlers
-        if not self.logger.handlers:
-            # Console Handler
-            console_handler = logging.StreamHandler()
-            console_handler.setLevel(logging.INFO)
-            console_formatter = logging.Formatter('%(asctime)s - %(message)s')
-            console_handler.setFormatter(console_formatter)
-            self.logger.addHandler(console_handler)
+        self.logger = _console_logger()
 
         # Database Setup
         self.db_path = db_path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+        # auto_vacuum only takes effect on a database that has not been initialised yet
+        self._conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA temp_store=MEMORY")
+        self._conn.execute("PRAGMA busy_timeout=5000")
         self._setup_database()
 
+        # Single writer: only the writer thread inserts rows, in batched transactions
+        self._queue: "queue.Queue[Optional[Tuple[float, str, Tuple[Any, ...]]]]" = queue.Queue(maxsize=self._QUEUE_SIZE)
+        self._closed = False
+        self._writer_thread = threading.Thread(target=self._writer_loop, daemon=True)
+        self._writer_thread.start()
+        atexit.register(self.close)
+
     def _setup_database(self):
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute('''CREATE TABLE IF NOT EXISTS logs (
-                            id INTEGER PRIMARY KEY,
-                            timestamp TEXT,
-                            message TEXT)''')
-        conn.commit()
-        conn.close()
+        with self._lock:
+            self._conn.execute(self._CREATE_TABLE_SQL)
+            self._conn.execute(self._CREATE_INDEX_SQL)
+
+    def _log_to_database(self, message: str, args: Tuple[Any, ...] = ()):
+        if self._closed:
+            return
+        self._queue.put((time.time(), message, args))
+
+    def _writer_loop(self):
+        running = True
+        while running:
+            # Sleep until there is work, then give the batch up to _FLUSH_INTERVAL to fill
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self._FLUSH_INTERVAL
+            while len(batch) < self._BATCH_SIZE and batch[-1] is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
 
-    def log(self, message: str):
+            # None is the shutdown sentinel queued by close()
+            rows = [item for item in batch if item is not None]
+            running = len(rows) == len(batch)
+            if rows:
+                try:
+                    self._write_rows(rows)
+                except Exception as e:
+                    self.logger.error(f"Error writing logs to database: {e}")
+            for _ in batch:
+                self._queue.task_done()
+
+    def _write_rows(self, rows: List[Tuple[float, str, Tuple[Any, ...]]]):
+        params = [(timestamp, _render_message(message, args)) for timestamp, message, args in rows]
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.executemany(self._INSERT_SQL, params)
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def flush(self):
+        # Block until every queued message has been committed
+        if not self._closed:
+            self._queue.join()
+
+    def rotate(self, archive_path: str) -> int:
+        # Copy the database to archive_path, then drop the archived rows from the live table
+        # VACUUM INTO refuses to overwrite, so check before flushing and touching the live table
+        if os.path.exists(archive_path):
+            raise FileExistsError(f"Archive {archive_path} already exists")
+        self.flush()
+        with self._lock:
+            max_id = self._conn.execute("SELECT MAX(id) FROM logs").fetchone()[0]
+            if max_id is None:
+                return 0
+            self._conn.execute("VACUUM INTO ?", (archive_path,))
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                deleted = self._conn.execute("DELETE FROM logs WHERE id <= ?", (max_id,)).rowcount
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("PRAGMA incremental_vacuum")
+            return deleted
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(None)
+        self._writer_thread.join()
+        self._conn.close()
+        atexit.unregister(self.close)
+
+class NdjsonLogger(BaseLogger):
+    # Appends log lines to <db_path>.ndjson and only loads them into SQLite on demand
+    def __init__(self, db_path: str = "logs.db"):
+        self.logger = _console_logger()
+        self.db_path = db_path
+        self.journal_path = f"{db_path}.ndjson"
+        self._lock = threading.Lock()
+        self._fh = open(self.journal_path, 'ab', buffering=1 << 16)
+        self._closed = False
+        atexit.register(self.close)
+
+    def _log_to_database(self, message: str, args: Tuple[Any, ...] = ()):
+        line = orjson.dumps({'t': time.time(), 'm': _render_message(message, args)}) + b'\n'
+        with self._lock:
+            if not self._closed:
+                self._fh.write(line)
+
+    def flush(self):
+        with self._lock:
+            if not self._closed:
+                self._fh.flush()
+
+    def sync_to_sqlite(self) -> int:
+        # Import the journal into the logs table in one transaction, then truncate it
+        with self._lock:
+            if not self._closed:
+                self._fh.flush()
+            with open(self.journal_path, 'rb') as file:
+                entries = [orjson.loads(line) for line in file if line.strip()]
+            conn = sqlite3.connect(self.db_path)
+            try:
+                with conn:
+                    conn.execute(self._CREATE_TABLE_SQL)
+                    conn.execute(self._CREATE_INDEX_SQL)
+                    conn.executemany(self._INSERT_SQL, [(entry['t'], entry['m']) for entry in entries])
+            finally:
+                conn.close()
+            os.truncate(self.journal_path, 0)
+            return len(entries)
+
+    def close(self):
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._fh.close()
+        atexit.unregister(self.close)
+
+
+class AsyncLogger:
+    # Logger for asyncio pipelines: inserts go through a pool of aiosqlite connections
+    # (log/info are coroutines, so this is not a BaseLogger and cannot be handed to listeners or order managers)
+    def __init__(self, db_path: str = "logs.db", pool_size: int = 5):
+        from aiosqlitepool import SQLiteConnectionPool
+
+        self.logger = _console_logger()
+        self.db_path = db_path
+        self._pool = SQLiteConnectionPool(self._connect, pool_size=pool_size)
+
+    async def _connect(self) -> Any:
+        import aiosqlite
+
+        conn = await aiosqlite.connect(self.db_path)
+        await conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+        await conn.execute("PRAGMA journal_mode=WAL")
+        await conn.execute("PRAGMA synchronous=NORMAL")
+        await conn.execute("PRAGMA temp_store=MEMORY")
+        await conn.execute("PRAGMA busy_timeout=5000")
+        await conn.execute(BaseLogger._CREATE_TABLE_SQL)
+        await conn.execute(BaseLogger._CREATE_INDEX_SQL)
+        await conn.commit()
+        return conn
+
+    async def log(self, message: Any):
+        message = _format_message(message)
         self.logger.info(message)
-        self._log_to_database(message)
-
-    def _log_to_database(self, message: str):
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute('INSERT INTO logs (timestamp, message) VALUES (datetime("now"), ?)', (message,))
-        conn.commit()
-        conn.close()
-
+        await self._insert(message)
+
+    async def info(self, fmt: str, *args: Any):
+        # Same contract as BaseLogger.info; the row is written right away, so it is rendered here
+        self.logger.info(fmt, *args)
+        await self._insert(_render_message(fmt, args))
+
+    async def _insert(self, message: str):
+        async with self._pool.connection() as conn:
+            await conn.execute(BaseLogger._INSERT_SQL, (time.time(), message))
+            await conn.commit()
+
+    async def close(self):
+        await self._pool.close()
+
+# Historical Data Cache
+class HistoricalDataCache:
+    # One parquet file per (exchange, symbol, timeframe) under <cache_dir>/<exchange_id>/
+    def __init__(self, exchange_id: str, cache_dir: str = CACHE_DIR):
+        self.exchange_id = exchange_id
+        self.cache_dir = cache_dir
+
+    def _path(self, symbol: str, timeframe: str) -> str:
+        return os.path.join(self.cache_dir, self.exchange_id, f"{symbol.replace('/', '-')}_{timeframe}.parquet")
+
+    def load(self, symbol: str, timeframe: str) -> np.ndarray:
+        # Raw candles sorted by timestamp, one row per candle
+        path = self._path(symbol, timeframe)
+        if not os.path.exists(path):
+            return np.empty((0, len(OHLCV_COLUMNS)))
+        return pd.read_parquet(path)[OHLCV_COLUMNS].to_numpy(dtype=np.float64)
+
+    def store(self, symbol: str, timeframe: str, candles: np.ndarray):
+        df = pd.DataFrame(candles, columns=OHLCV_COLUMNS).astype({"timestamp": "int64"})
+        path = self._path(symbol, timeframe)
+        # Created on first write, so an unwritable cache_dir only costs the cache, not the listener
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write to a temporary file and rename so readers never see a partial file
+        tmp_path = f"{path}.tmp"
+        df.to_parquet(tmp_path, index=False)
+        os.replace(tmp_path, path)
 
 class BaseListener:
-    def __init__(self, exchange_id: str, crypto_symbols: List[str], logger: Logger):
+    def __init__(self, exchange_id: str, crypto_symbols: List[str], logger: BaseLogger, cache_dir: str = CACHE_DIR):
         self.crypto_symbols = crypto_symbols
         self.logger = logger
-        self.exchange = getattr(ccxt, exchange_id)()
-        self.exchange.load_markets()
+        self.cache_dir = cache_dir
+        self.cache = HistoricalDataCache(exchange_id, cache_dir) if cache_dir else None
+        self.exchange = _get_exchange(exchange_id)
+        if not self.exchange.markets:
+            _load_markets(exchange_id, self.exchange, logger, cache_dir)
 
-    def fetch_price(self, symbol: str) -> CryptoPrice:
+    def fetch_price(self, symbol: str) -> Optional[CryptoPrice]:
         try:
             ticker = self.exchange.fetch_ticker(symbol)
             price = ticker['last']
@@ -81,68 +441,249 @@ class BaseListener:
         except Exception as e:
             self.logger.log(f"Error fetching live price for {symbol}: {e}")
             return None
-        
-    def fetch_historical_data(self, symbol: str, timeframe: str, start: datetime, end: datetime) -> List[Dict]:
+
+    def fetch_prices(self, symbols: List[str]) -> List[CryptoPrice]:
+        # One fetch_tickers request for all symbols when the exchange supports it
+        if not self.exchange.has.get('fetchTickers'):
+            fetched = [self.fetch_price(symbol) for symbol in symbols]
+            return [price for price in fetched if price is not None]
         try:
-            start_timestamp = int(start.timestamp() * 1000)  # Convert start date to milliseconds
-            end_timestamp = int(end.timestamp() * 1000)      # Convert end date to milliseconds
-            all_data = []
-            current_start = start_timestamp
+            tickers = self.exchange.fetch_tickers(symbols)
+            prices = []
+            for symbol in symbols:
+                ticker = tickers.get(symbol)
+                if ticker is None:
+                    self.logger.log(f"Error fetching live price for {symbol}: no ticker returned")
+                    continue
+                price = ticker['last']
+                self.logger.log(f"Live price of {symbol}: {price}")
+                prices.append(CryptoPrice(symbol=symbol, price=price))
+            return prices
+        except Exception as e:
+            self.logger.log(f"Error fetching live prices for {', '.join(symbols)}: {e}")
+            return []
 
-            while current_start < end_timestamp:
-                ohlcv = self.exchange.fetch_ohlcv(symbol, timeframe=timeframe, since=current_start)
-                if not ohlcv:
-                    break
-                self.logger.log(f"Fetched batch of historical data for {symbol} with timeframe {timeframe}.")
-                all_data.extend(ohlcv)
+    def _fetch_ohlcv_range(self, symbol: str, timeframe: str, start_timestamp: int, end_timestamp: int) -> List[List[Any]]:
+        all_data = []
+        current_start = start_timestamp
 
-                # Update current_start to fetch the next batch
-                last_timestamp = ohlcv[-1][0]
-                if last_timestamp >= end_timestamp:
-                    break
-                current_start = last_timestamp + 1
+        while current_start < end_timestamp:
+            ohlcv = self.exchange.fetch_ohlcv(symbol, timeframe=timeframe, since=current_start)
+            if not ohlcv:
+                break
+            self.logger.info("Fetched batch of historical data for %s with timeframe %s.", symbol, timeframe)
+            all_data.extend(ohlcv)
 
-            return [
-                {
-                    "timestamp": datetime.fromtimestamp(candle[0] / 1000),
-                    "open": candle[1],
-                    "high": candle[2],
-                    "low": candle[3],
-                    "close": candle[4],
-                    "volume": candle[5]
-                }
-                for candle in all_data if candle[0] < end_timestamp
-            ]
-        except Exception as e:
-            self.logger.log(f"Error fetching historical data for {symbol}: {e}")
-            return []
+            # Update current_start to fetch the next batch
+            last_timestamp = int(ohlcv[-1][0])
+            if last_timestamp >= end_timestamp:
+                break
+            current_start = last_timestamp + 1
 
+        return all_data
 
+    def fetch_historical_data(self, symbol: str, timeframe: str, start: datetime, end: datetime) -> pd.DataFrame:
+        try:
+            start_timestamp = int(start.timestamp() * 1000)  # Convert start date to milliseconds
+            end_timestamp = int(end.timestamp() * 1000)      # Convert end date to milliseconds
+            if self.cache is None:
+                all_data = self._fetch_ohlcv_range(symbol, timeframe, start_timestamp, end_timestamp)
+                return _ohlcv_to_dataframe(all_data, end_timestamp)
+            return self._fetch_cached_historical_data(self.cache, symbol, timeframe, start_timestamp, end_timestamp)
+        except Exception as e:
+            self.logger.log(f"Error fetching historical data for {symbol}: {e}")
+            return _ohlcv_to_dataframe([], 0)
 
-    def create_dataframe(self, data: List[Dict]) -> pd.DataFrame:
+    def _fetch_cached_historical_data(self, cache: HistoricalDataCache, symbol: str, timeframe: str, start_timestamp: int, end_timestamp: int) -> pd.DataFrame:
+        try:
+            cached = cache.load(symbol, timeframe)
+        except Exception as e:
+            self.logger.log(f"Error reading historical data cache for {symbol}: {e}")
+            cached = np.empty((0, len(OHLCV_COLUMNS)))
+        timeframe_ms = self.exchange.parse_timeframe(timeframe) * 1000
+
+        # Only fetch what the cache is missing, keeping the cached range contiguous
+        gaps = []
+        if len(cached) == 0:
+            gaps.append((start_timestamp, end_timestamp))
+        else:
+            first_timestamp = int(cached[0, 0])
+            last_timestamp = int(cached[-1, 0])
+            if start_timestamp < first_timestamp:
+                gaps.append((start_timestamp, first_timestamp))
+            if end_timestamp > last_timestamp + timeframe_ms:
+                gaps.append((last_timestamp + timeframe_ms, end_timestamp))
+
+        candles = cached
+        if gaps:
+            fetched = [candle for gap in gaps for candle in self._fetch_ohlcv_range(symbol, timeframe, *gap)]
+            if fetched:
+                candles = np.concatenate([cached, np.asarray(fetched, dtype=np.float64)])
+                _, unique_index = np.unique(candles[:, 0], return_index=True)
+                candles = candles[unique_index]
+
+                # Candles that have not closed yet may still change, so they are not cached
+                closed_until = int(time.time() * 1000) - timeframe_ms
+                closed = candles[candles[:, 0] <= closed_until]
+                if len(closed) > len(cached):
+                    try:
+                        cache.store(symbol, timeframe, closed)
+                    except Exception as e:
+                        self.logger.log(f"Error writing historical data cache for {symbol}: {e}")
+
+        lo, hi = np.searchsorted(candles[:, 0], [start_timestamp, end_timestamp])
+        return _ohlcv_to_dataframe(candles[lo:hi], end_timestamp)
+
+    def create_dataframe(self, data) -> pd.DataFrame:
+        # Deprecated: fetch_historical_data already returns a DataFrame
+        if isinstance(data, pd.DataFrame):
+            return data
         return pd.DataFrame(data)
 
 class Listener(BaseListener):
     def listen_to_prices(self):
         while True:
             try:
-                for symbol in self.crypto_symbols:
-                    price = self.fetch_price(symbol)
-                    if price:
-                        print(f"Price of {price.symbol}: {price.price}")
+                for price in self.fetch_prices(self.crypto_symbols):
+                    print(f"Price of {price.symbol}: {price.price}")
             except Exception as e:
                 self.logger.log(f"Error in listener: {e}")
             time.sleep(5)
 
+class StreamingListener(BaseListener):
+    # Push-based listener: ccxt.pro streams tickers over a WebSocket, REST polling is the fallback
+    def __init__(self, exchange_id: str, crypto_symbols: List[str], logger: BaseLogger, cache_dir: str = CACHE_DIR):
+        super().__init__(exchange_id, crypto_symbols, logger, cache_dir)
+        exchange_class = getattr(ccxtpro, exchange_id, None)
+        self.stream_exchange = exchange_class({'enableRateLimit': True}) if exchange_class else None
+        # Reuse the markets BaseListener just loaded instead of downloading them again on the first watch
+        if self.stream_exchange is not None and self.exchange.markets:
+            self.stream_exchange.set_markets(self.exchange.markets, self.exchange.currencies)
+
+    async def _dispatch(self, price: CryptoPrice, callback: Optional[Callable[[CryptoPrice], Any]]):
+        if callback is None:
+            print(f"Price of {price.symbol}: {price.price}")
+            return
+        result = callback(price)
+        if inspect.isawaitable(result):
+            await result
+
+    async def _poll(self, callback: Optional[Callable[[CryptoPrice], Any]]):
+        while True:
+            try:
+                for price in await asyncio.to_thread(self.fetch_prices, self.crypto_symbols):
+                    await self._dispatch(price, callback)
+            except Exception as e:
+                self.logger.log(f"Error in listener: {e}")
+            await asyncio.sleep(5)
+
+    async def listen_to_prices(self, callback: Optional[Callable[[CryptoPrice], Any]] = None):
+        # callback receives every CryptoPrice update, e.g. an asyncio.Queue's put
+        if self.stream_exchange is None or not self.stream_exchange.has.get('watchTickers'):
+            self.logger.log("Ticker streaming not supported, falling back to polling.")
+            return await self._poll(callback)
+
+        while True:
+            try:
+                tickers = await self.stream_exchange.watch_tickers(self.crypto_symbols)
+                for symbol, ticker in tickers.items():
+                    price = CryptoPrice(symbol=symbol, price=ticker['last'])
+                    self.logger.log(f"Live price of {symbol}: {price.price}")
+                    await self._dispatch(price, callback)
+            except Exception as e:
+                self.logger.log(f"Error in listener: {e}")
+                await asyncio.sleep(1)
+
+    async def close(self):
+        if self.stream_exchange is not None:
+            await self.stream_exchange.close()
+
+class AsyncListener:
+    def __init__(self, exchange_id: str, crypto_symbols: List[str], logger: BaseLogger):
+        self.crypto_symbols = crypto_symbols
+        self.logger = logger
+        # A single async exchange instance keeps one aiohttp session for all requests
+        self.exchange = getattr(ccxt_async, exchange_id)({'enableRateLimit': True})
+
+    async def fetch_price(self, symbol: str) -> Optional[CryptoPrice]:
+        try:
+            ticker = await self.exchange.fetch_ticker(symbol)
+            price = ticker['last']
+            self.logger.log(f"Live price of {symbol}: {price}")
+            return CryptoPrice(symbol=symbol, price=price)
+        except Exception as e:
+            self.logger.log(f"Error fetching live price for {symbol}: {e}")
+            return None
+
+    async def _fetch_page(self, symbol: str, timeframe: str, since: int, limit: int, semaphore: asyncio.Semaphore) -> List[List[Any]]:
+        # A method rather than a closure: mypyc drops closures that call a sibling closure
+        async with semaphore:
+            ohlcv = await self.exchange.fetch_ohlcv(symbol, timeframe=timeframe, since=since, limit=limit)
+        self.logger.info("Fetched batch of historical data for %s with timeframe %s.", symbol, timeframe)
+        return ohlcv
+
+    async def fetch_historical_data(self, symbol: str, timeframe: str, start: datetime, end: datetime, max_concurrency: int = 5) -> pd.DataFrame:
+        try:
+            start_timestamp = int(start.timestamp() * 1000)  # Convert start date to milliseconds
+            end_timestamp = int(end.timestamp() * 1000)      # Convert end date to milliseconds
+
+            limit = self.exchange.options.get('defaultLimit', 500)
+            timeframe_ms = self.exchange.parse_timeframe(timeframe) * 1000
+            semaphore = asyncio.Semaphore(max_concurrency)
+
+            # Probe one page to learn how many candles the exchange really returns per request
+            # (many cap below the requested limit), then request the remaining pages at once
+            probe = await self._fetch_page(symbol, timeframe, start_timestamp, limit, semaphore)
+            if not probe:
+                return _ohlcv_to_dataframe([], 0)
+            step = timeframe_ms * len(probe)
+            page_starts = list(range(int(probe[0][0]) + step, end_timestamp, step))
+            pages = [probe] + list(await asyncio.gather(*(self._fetch_page(symbol, timeframe, since, limit, semaphore) for since in page_starts)))
+
+            async def fill_tail(page: List[List[Any]], next_start: int):
+                # A page that stops short of the next page's start is completed one request at a time
+                while page and page[-1][0] + timeframe_ms < next_start:
+                    since = int(page[-1][0]) + timeframe_ms
+                    ohlcv = await self._fetch_page(symbol, timeframe, since, limit, semaphore)
+                    if not ohlcv or ohlcv[-1][0] < since:
+                        break
+                    page.extend(ohlcv)
+
+            await asyncio.gather(*(fill_tail(page, next_start) for page, next_start in zip(pages, page_starts + [end_timestamp])))
+
+            # Merge pages, dropping candles repeated at page edges
+            candles = {candle[0]: candle for page in pages for candle in page}
+            return _ohlcv_to_dataframe([candles[ts] for ts in sorted(candles)], end_timestamp)
+        except Exception as e:
+            self.logger.log(f"Error fetching historical data for {symbol}: {e}")
+            return _ohlcv_to_dataframe([], 0)
+
+    async def listen_to_prices(self):
+        while True:
+            try:
+                results = await asyncio.gather(
+                    *(self.fetch_price(symbol) for symbol in self.crypto_symbols),
+                    return_exceptions=True
+                )
+                for price in results:
+                    if isinstance(price, CryptoPrice):
+                        print(f"Price of {price.symbol}: {price.price}")
+            except Exception as e:
+                self.logger.log(f"Error in listener: {e}")
+            await asyncio.sleep(5)
+
+    async def close(self):
+        await self.exchange.close()
+
 class Uploader:
-    def __init__(self, config_path: str, order_manager_class, logger: Logger):
+    def __init__(self, config_path: str, order_manager_class: Any, logger: BaseLogger):
         self.api_keys: Dict[str, APIKey] = self.load_keys(config_path)
         self.order_manager_class = order_manager_class
         self.logger = logger
 
     def load_keys(self, config_path: str) -> Dict[str, APIKey]:
-        with open(config_path, 'r') as file:
-            data = json.load(file)
+        with open(config_path, 'rb') as file:
+            data = orjson.loads(file.read())
         return {name: APIKey(**creds) for name, creds in data.items()}
 
     def connect_api(self, api_names: List[str]):
@@ -165,50 +706,80 @@ class Broker(Uploader):
         else:
             self.logger.log(f"Broker {broker_name} keys not found.")
 
-class AlpacaOrderManager:
-    def __init__(self, exchange_id: str, credentials: APIKey, logger):
+class BaseOrderManager(ABC):
+    def __init__(self, exchange_id: str, credentials: APIKey, logger: BaseLogger):
         self.logger = logger
-        if exchange_id.lower() == "alpaca":
-            self.api = alpaca.REST(
-                credentials.key, 
-                credentials.secret, 
-                "https://paper-api.alpaca.markets"
-            )
-        else:
-            self.api = getattr(ccxt, exchange_id)({
-                'apiKey': credentials.key,
-                'secret': credentials.secret
-            })
 
-    def create_order(self, symbol: str, order_type: OrderType, side: str, qty: float, price: float = None, time_in_force: str = "gtc"):
+    @abstractmethod
+    def create_order(self, symbol: str, order_type: OrderType, side: str, qty: float, price: Optional[float] = None, time_in_force: str = "gtc"):
+        ...
+
+    def create_orders(self, orders: List[Dict[str, Any]]) -> List[Any]:
+        # Each dict holds create_order keyword arguments
+        return [self.create_order(**order) for order in orders]
+
+    @abstractmethod
+    def fetch_open_orders(self, symbol: Optional[str] = None):
+        ...
+
+    @abstractmethod
+    def cancel_order(self, order_id: str, symbol: Optional[str] = None):
+        ...
+
+    @abstractmethod
+    def exit_position(self, symbol: str):
+        ...
+
+    @abstractmethod
+    def exit_positions(self, symbols: List[str]) -> Dict[str, Any]:
+        ...
+
+    @abstractmethod
+    def fetch_order_status(self, order_id: str):
+        ...
+
+    @abstractmethod
+    def fetch_positions(self):
+        ...
+
+    @abstractmethod
+    def modify_order(self, order_id: str, qty: Optional[float] = None, price: Optional[float] = None):
+        ...
+
+class AlpacaBackendManager(BaseOrderManager):
+    MAX_ORDER_WORKERS = 8
+
+    def __init__(self, exchange_id: str, credentials: APIKey, logger: BaseLogger):
+        super().__init__(exchange_id, credentials, logger)
+        self.session = _build_session()
+        self.api = alpaca.REST(
+            credentials.key, 
+            credentials.secret, 
+            "https://paper-api.alpaca.markets"
+        )
+        self.api._session = self.session
+
+    def create_order(self, symbol: str, order_type: OrderType, side: str, qty: float, price: Optional[float] = None, time_in_force: str = "gtc"):
         try:
-            if isinstance(self.api, alpaca.REST):
-                if order_type == OrderType.LIMIT:
-                    order = self.api.submit_order(
-                        symbol=symbol,
-                        qty=qty,
-                        side=side,
-                        type="limit",
-                        time_in_force=time_in_force,
-                        limit_price=price
-                    )
-                elif order_type == OrderType.MARKET:
-                    order = self.api.submit_order(
-                        symbol=symbol,
-                        qty=qty,
-                        side=side,
-                        type="market",
-                        time_in_force=time_in_force
-                    )
-                else:
-                    raise ValueError("Unsupported order type")
+            if order_type == OrderType.LIMIT:
+                order = self.api.submit_order(
+                    symbol=symbol,
+                    qty=qty,
+                    side=side,
+                    type="limit",
+                    time_in_force=time_in_force,
+                    limit_price=price
+                )
+            elif order_type == OrderType.MARKET:
+                order = self.api.submit_order(
+                    symbol=symbol,
+                    qty=qty,
+                    side=side,
+                    type="market",
+                    time_in_force=time_in_force
+                )
             else:
-                if order_type == OrderType.LIMIT:
-                    order = self.api.create_limit_order(symbol, side, qty, price)
-                elif order_type == OrderType.MARKET:
-                    order = self.api.create_market_order(symbol, side, qty)
-                else:
-                    raise ValueError("Unsupported order type")
+                raise ValueError("Unsupported order type")
 
             self.logger.log(f"Order placed: {order}")
             return order
@@ -217,71 +788,71 @@ class AlpacaOrderManager:
             self.logger.log(f"Error placing order: {e}")
             return None
 
-    def fetch_open_orders(self, symbol: str = None):
+    def create_orders(self, orders: List[Dict[str, Any]]) -> List[Any]:
+        # Each order gets its own REST call on the pooled session, so submit them concurrently
+        with ThreadPoolExecutor(max_workers=self.MAX_ORDER_WORKERS) as executor:
+            return list(executor.map(lambda order: self.create_order(**order), orders))
+
+    def fetch_open_orders(self, symbol: Optional[str] = None):
         try:
-            if isinstance(self.api, alpaca.REST):
-                open_orders = self.api.list_orders(status="open")
-            else:
-                open_orders = self.api.fetch_open_orders(symbol)
+            open_orders = self.api.list_orders(status="open")
             self.logger.log(f"Open orders: {open_orders}")
             return open_orders
         except Exception as e:
             self.logger.log(f"Error fetching open orders: {e}")
             return []
 
-    def cancel_order(self, order_id: str, symbol: str = None):
+    def cancel_order(self, order_id: str, symbol: Optional[str] = None):
         try:
-            if isinstance(self.api, alpaca.REST):
-                result = self.api.cancel_order(order_id)
-            else:
-                result = self.api.cancel_order(order_id, symbol)
+            result = self.api.cancel_order(order_id)
             self.logger.log(f"Order {order_id} canceled.")
             return result
         except Exception as e:
             self.logger.log(f"Error canceling order: {e}")
             return None
 
+    def _exit_with_positions(self, symbol: str, positions: List[Any]):
+        for position in positions:
+            if position.symbol == symbol:
+                qty = float(position.qty)
+                side = "sell" if qty > 0 else "buy"
+                self.logger.log(f"Exiting position: {qty} {symbol} with a {side} order")
+                order = self.create_order(
+                    symbol=symbol,
+                    order_type=OrderType.MARKET,
+                    side=side,
+                    qty=abs(qty)
+                )
+                return order
+        self.logger.log(f"No open position found for symbol: {symbol}")
+        return None
+
     def exit_position(self, symbol: str):
         try:
-            if isinstance(self.api, alpaca.REST):
-                positions = self.api.list_positions()
-                for position in positions:
-                    if position.symbol == symbol:
-                        qty = float(position.qty)
-                        side = "sell" if qty > 0 else "buy"
-                        self.logger.log(f"Exiting position: {qty} {symbol} with a {side} order")
-                        order = self.create_order(
-                            symbol=symbol,
-                            order_type=OrderType.MARKET,
-                            side=side,
-                            qty=abs(qty)
-                        )
-                        return order
-                self.logger.log(f"No open position found for symbol: {symbol}")
-                return None
-            else:
-                balance = self.api.fetch_balance()
-                symbol_info = self.api.market(symbol)
-                position_qty = balance.get(symbol_info['base'], {}).get('free', 0)
-                if position_qty > 0:
-                    order = self.api.create_market_sell_order(symbol, position_qty)
-                elif position_qty < 0:
-                    order = self.api.create_market_buy_order(symbol, abs(position_qty))
-                else:
-                    self.logger.log(f"No open position found for symbol: {symbol}")
-                    return None
-                self.logger.log(f"Exited position in {symbol}: {order}")
-                return order
+            return self._exit_with_positions(symbol, self.api.list_positions())
         except Exception as e:
             self.logger.log(f"Error exiting position for {symbol}: {e}")
             return None
 
+    def exit_positions(self, symbols: List[str]) -> Dict[str, Any]:
+        # One positions request for the whole batch
+        try:
+            positions = self.api.list_positions()
+        except Exception as e:
+            self.logger.log(f"Error fetching positions to exit: {e}")
+            return {symbol: None for symbol in symbols}
+        results = {}
+        for symbol in symbols:
+            try:
+                results[symbol] = self._exit_with_positions(symbol, positions)
+            except Exception as e:
+                self.logger.log(f"Error exiting position for {symbol}: {e}")
+                results[symbol] = None
+        return results
+
     def fetch_order_status(self, order_id: str):
         try:
-            if isinstance(self.api, alpaca.REST):
-                order = self.api.get_order(order_id)
-            else:
-                order = self.api.fetch_order(order_id)
+            order = self.api.get_order(order_id)
             self.logger.log(f"Order status for {order_id}: {order}")
             return order
         except Exception as e:
@@ -290,29 +861,158 @@ class AlpacaOrderManager:
 
     def fetch_positions(self):
         try:
-            if isinstance(self.api, alpaca.REST):
-                positions = self.api.list_positions()
-            else:
-                positions = self.api.fetch_balance()
+            positions = self.api.list_positions()
             self.logger.log(f"Fetched positions: {positions}")
             return positions
         except Exception as e:
             self.logger.log(f"Error fetching positions: {e}")
             return None
 
-    def modify_order(self, order_id: str, qty: float = None, price: float = None):
+    def modify_order(self, order_id: str, qty: Optional[float] = None, price: Optional[float] = None):
         try:
-            if isinstance(self.api, alpaca.REST):
-                modified_order = self.api.replace_order(
-                    order_id=order_id,
-                    qty=qty,
-                    limit_price=price
-                )
-            else:
-                self.logger.log("Order modification is not supported for ccxt-based exchanges.")
-                return None
+            modified_order = self.api.replace_order(
+                order_id=order_id,
+                qty=qty,
+                limit_price=price
+            )
             self.logger.log(f"Order modified: {modified_order}")
             return modified_order
         except Exception as e:
             self.logger.log(f"Error modifying order {order_id}: {e}")
             return None
+
+class CcxtBackendManager(BaseOrderManager):
+    def __init__(self, exchange_id: str, credentials: APIKey, logger: BaseLogger):
+        super().__init__(exchange_id, credentials, logger)
+        self.api = _get_exchange(exchange_id, credentials)
+        self.session = self.api.session
+        self._base_of: Dict[str, str] = {}
+        try:
+            if not self.api.markets:
+                _load_markets(exchange_id, self.api, logger)
+            self._base_of = {symbol: market['base'] for symbol, market in self.api.markets.items()}
+        except Exception as e:
+            self.logger.log(f"Error loading markets for {exchange_id}: {e}")
+
+    def create_order(self, symbol: str, order_type: OrderType, side: str, qty: float, price: Optional[float] = None, time_in_force: str = "gtc"):
+        try:
+            if order_type == OrderType.LIMIT:
+                order = self.api.create_limit_order(symbol, side, qty, price)
+            elif order_type == OrderType.MARKET:
+                order = self.api.create_market_order(symbol, side, qty)
+            else:
+                raise ValueError("Unsupported order type")
+
+            self.logger.log(f"Order placed: {order}")
+            return order
+
+        except Exception as e:
+            self.logger.log(f"Error placing order: {e}")
+            return None
+
+    def create_orders(self, orders: List[Dict[str, Any]]) -> List[Any]:
+        if not self.api.has.get('createOrders'):
+            # The ccxt instance is shared and not thread-safe (nonce, throttler), so orders go out one by one
+            return super().create_orders(orders)
+        # Exchanges with a batch endpoint take every order in a single request
+        try:
+            requests_batch = [
+                {
+                    'symbol': order['symbol'],
+                    'type': order['order_type'].name.lower(),
+                    'side': order['side'],
+                    'amount': order['qty'],
+                    'price': order.get('price')
+                }
+                for order in orders
+            ]
+            placed = self.api.create_orders(requests_batch)
+            self.logger.log(f"Orders placed: {placed}")
+            return placed
+        except Exception as e:
+            self.logger.log(f"Error placing orders: {e}")
+            return [None] * len(orders)
+
+    def fetch_open_orders(self, symbol: Optional[str] = None):
+        try:
+            open_orders = self.api.fetch_open_orders(symbol)
+            self.logger.log(f"Open orders: {open_orders}")
+            return open_orders
+        except Exception as e:
+            self.logger.log(f"Error fetching open orders: {e}")
+            return []
+
+    def cancel_order(self, order_id: str, symbol: Optional[str] = None):
+        try:
+            result = self.api.cancel_order(order_id, symbol)
+            self.logger.log(f"Order {order_id} canceled.")
+            return result
+        except Exception as e:
+            self.logger.log(f"Error canceling order: {e}")
+            return None
+
+    def _exit_with_balance(self, symbol: str, balance: Dict[str, Any]):
+        base = self._base_of.get(symbol) or self.api.market(symbol)['base']
+        position_qty = balance.get(base, {}).get('free', 0)
+        if position_qty > 0:
+            order = self.api.create_market_sell_order(symbol, position_qty)
+        elif position_qty < 0:
+            order = self.api.create_market_buy_order(symbol, abs(position_qty))
+        else:
+            self.logger.log(f"No open position found for symbol: {symbol}")
+            return None
+        # exit_positions reuses one balance snapshot, so a later symbol with the same base sees nothing left to exit
+        balance[base]['free'] = 0
+        self.logger.log(f"Exited position in {symbol}: {order}")
+        return order
+
+    def exit_position(self, symbol: str):
+        try:
+            return self._exit_with_balance(symbol, self.api.fetch_balance())
+        except Exception as e:
+            self.logger.log(f"Error exiting position for {symbol}: {e}")
+            return None
+
+    def exit_positions(self, symbols: List[str]) -> Dict[str, Any]:
+        # One balance request for the whole batch
+        try:
+            balance = self.api.fetch_balance()
+        except Exception as e:
+            self.logger.log(f"Error fetching balance to exit positions: {e}")
+            return {symbol: None for symbol in symbols}
+        results = {}
+        for symbol in symbols:
+            try:
+                results[symbol] = self._exit_with_balance(symbol, balance)
+            except Exception as e:
+                self.logger.log(f"Error exiting position for {symbol}: {e}")
+                results[symbol] = None
+        return results
+
+    def fetch_order_status(self, order_id: str):
+        try:
+            order = self.api.fetch_order(order_id)
+            self.logger.log(f"Order status for {order_id}: {order}")
+            return order
+        except Exception as e:
+            self.logger.log(f"Error fetching order status: {e}")
+            return None
+
+    def fetch_positions(self):
+        try:
+            positions = self.api.fetch_balance()
+            self.logger.log(f"Fetched positions: {positions}")
+            return positions
+        except Exception as e:
+            self.logger.log(f"Error fetching positions: {e}")
+            return None
+
+    def modify_order(self, order_id: str, qty: Optional[float] = None, price: Optional[float] = None):
+        self.logger.log("Order modification is not supported for ccxt-based exchanges.")
+        return None
+
+def AlpacaOrderManager(exchange_id: str, credentials: APIKey, logger: BaseLogger) -> BaseOrderManager:
+    # Factory: picks the backend once at construction instead of branching on every call
+    if exchange_id.lower() == "alpaca":
+        return AlpacaBackendManager(exchange_id, credentials, logger)
+    return CcxtBackendManager(exchange_id, credentials, logger)
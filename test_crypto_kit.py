@@ -2,7 +2,55 @@ import unittest
 import sqlite3
 import json
 import time
-from Crypto.crypto_kit import Logger, Listener, AlpacaOrderManager, OrderType, APIKey
+import gc
+import os
+import shutil
+import tempfile
+import weakref
+import threading
+import asyncio
+from datetime import datetime, timezone
+from unittest import mock
+import ccxt
+from Crypto import crypto_kit
+from Crypto.crypto_kit import Logger, NdjsonLogger, AsyncLogger, Listener, BaseListener, AsyncListener, AlpacaOrderManager, OrderType, APIKey
+from Crypto.crypto_kit import BaseOrderManager, CcxtBackendManager, StreamingListener, CryptoPrice, _ohlcv_to_dataframe, _load_markets
+
+HOUR_MS = 60 * 60 * 1000
+
+# A mypyc build has native classes without weakref support
+COMPILED = not crypto_kit.__file__.endswith(".py")
+
+def offline_markets(exchange_id):
+    # Serve a fresh, empty markets cache entry so constructors skip the network load
+    entry = {"fetched_at": time.time(), "markets": {}, "currencies": {}}
+    return mock.patch.dict(crypto_kit._MARKETS_CACHE, {exchange_id: entry})
+
+class StubExchange:
+    # Serves hourly candles between first and last timestamp, returning at most max_limit per request
+    options: dict = {}
+    parse_timeframe = staticmethod(ccxt.Exchange.parse_timeframe)
+
+    def __init__(self, first_timestamp, last_timestamp, max_limit=300, close=1.0):
+        self.first_timestamp = first_timestamp
+        self.last_timestamp = last_timestamp
+        self.max_limit = max_limit
+        self.close = close
+        self.calls = []
+
+    def fetch_ohlcv(self, symbol, timeframe="1h", since=None, limit=None):
+        self.calls.append(since)
+        count = min(limit or self.max_limit, self.max_limit)
+        first = max(self.first_timestamp, -(-since // HOUR_MS) * HOUR_MS)
+        last = min(self.last_timestamp, first + (count - 1) * HOUR_MS)
+        return [[ts, 1.0, 1.0, 1.0, self.close, 1.0] for ts in range(first, last + 1, HOUR_MS)]
+
+class AsyncStubExchange(StubExchange):
+    async def fetch_ohlcv(self, symbol, timeframe="1h", since=None, limit=None):
+        return StubExchange.fetch_ohlcv(self, symbol, timeframe, since, limit)
+
+def utc_ms(*args):
+    return int(datetime(*args, tzinfo=timezone.utc).timestamp() * 1000)
 
 class TestTradingModule(unittest.TestCase):
 
@@ -31,6 +79,7 @@ class TestTradingModule(unittest.TestCase):
         time.sleep(5)
         message = "Test log message"
         self.logger.log(message)
+        self.logger.flush()
 
         # Check Database Entry
         conn = sqlite3.connect(self.logger.db_path)
@@ -154,5 +203,364 @@ class TestTradingModule(unittest.TestCase):
             self.logger.log(f"Error during test_fetch_positions: {e}")
             self.fail(f"Exception during test_fetch_positions: {e}")
 
+class TestLogger(unittest.TestCase):
+    # Runs offline against a temporary database
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.tmp_dir, "logs.db")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    @unittest.skipIf(COMPILED, "native classes cannot be weakly referenced")
+    def test_closed_logger_is_released(self):
+        logger = Logger(db_path=self.db_path)
+        logger.log("Short-lived logger")
+        logger.close()
+        ref = weakref.ref(logger)
+        del logger
+        gc.collect()
+        self.assertIsNone(ref(), "Closed logger is still referenced")
+
+    def test_concurrent_messages_are_all_committed(self):
+        logger = Logger(db_path=self.db_path)
+        threads = [
+            threading.Thread(target=lambda n=n: [logger.log(f"thread {n} message {i}") for i in range(50)])
+            for n in range(4)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        logger.flush()
+        logger.close()
+
+        conn = sqlite3.connect(self.db_path)
+        count = conn.execute("SELECT COUNT(*) FROM logs").fetchone()[0]
+        conn.close()
+        self.assertEqual(count, 200)
+
+    def test_info_stores_args_as_they_were_when_logged(self):
+        logger = Logger(db_path=self.db_path)
+        state = {"step": 1}
+        for step in range(1, 4):
+            state["step"] = step
+            logger.info("state %s", state)
+        logger.close()
+
+        conn = sqlite3.connect(self.db_path)
+        messages = [row[0] for row in conn.execute("SELECT message FROM logs ORDER BY id")]
+        conn.close()
+        self.assertEqual(messages, [f"state {{'step': {step}}}" for step in range(1, 4)])
+
+    def test_info_defers_formatting_of_scalar_args(self):
+        logger = Logger(db_path=self.db_path)
+        with mock.patch.object(logger.logger, "info") as console, \
+                mock.patch.object(logger._queue, "put", wraps=logger._queue.put) as put:
+            logger.info("fetched %s page %d", "BTC/USDT", 3)
+        logger.close()
+
+        console.assert_called_once_with("fetched %s page %d", "BTC/USDT", 3)
+        self.assertEqual(put.call_args[0][0][1:], ("fetched %s page %d", ("BTC/USDT", 3)))
+        conn = sqlite3.connect(self.db_path)
+        messages = [row[0] for row in conn.execute("SELECT message FROM logs")]
+        conn.close()
+        self.assertEqual(messages, ["fetched BTC/USDT page 3"])
+
+    def test_rotate_archives_and_empties_live_table(self):
+        logger = Logger(db_path=self.db_path)
+        for i in range(5):
+            logger.log(f"message {i}")
+        archive_path = os.path.join(self.tmp_dir, "archive.db")
+        self.assertEqual(logger.rotate(archive_path), 5)
+        self.assertEqual(logger.rotate(os.path.join(self.tmp_dir, "empty.db")), 0)
+        with self.assertRaises(FileExistsError):
+            logger.rotate(archive_path)
+        logger.log("after rotate")
+        logger.close()
+
+        archive = sqlite3.connect(archive_path)
+        archived = [row[0] for row in archive.execute("SELECT message FROM logs ORDER BY id")]
+        indexes = [row[0] for row in archive.execute("SELECT name FROM sqlite_master WHERE type = 'index'")]
+        archive.close()
+        self.assertEqual(archived, [f"message {i}" for i in range(5)])
+        self.assertIn("idx_logs_ts", indexes)
+
+        conn = sqlite3.connect(self.db_path)
+        live = [row[0] for row in conn.execute("SELECT message FROM logs")]
+        conn.close()
+        self.assertEqual(live, ["after rotate"])
+
+    def test_async_logger_writes_rows_in_wal_mode(self):
+        async def write():
+            logger = AsyncLogger(db_path=self.db_path, pool_size=2)
+            await asyncio.gather(*(logger.log(f"message {i}") for i in range(5)))
+            await logger.info("fetched %s", "BTC/USDT")
+            await logger.close()
+
+        asyncio.run(write())
+        conn = sqlite3.connect(self.db_path)
+        messages = sorted(row[0] for row in conn.execute("SELECT message FROM logs"))
+        journal_mode = conn.execute("PRAGMA journal_mode").fetchone()[0]
+        indexes = [row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")]
+        conn.close()
+        self.assertEqual(messages, ["fetched BTC/USDT"] + [f"message {i}" for i in range(5)])
+        self.assertEqual(journal_mode, "wal")
+        self.assertIn("idx_logs_ts", indexes)
+
+    def test_ndjson_journal_syncs_to_sqlite(self):
+        logger = NdjsonLogger(db_path=self.db_path)
+        logger.log("first")
+        logger.log({"qty": 1})
+        self.assertEqual(logger.sync_to_sqlite(), 2)
+        self.assertEqual(os.path.getsize(logger.journal_path), 0, "Journal was not truncated")
+        self.assertEqual(logger.sync_to_sqlite(), 0)
+
+        logger.log("second")
+        logger.close()
+        self.assertEqual(logger.sync_to_sqlite(), 1)
+
+        conn = sqlite3.connect(self.db_path)
+        messages = [row[0] for row in conn.execute("SELECT message FROM logs ORDER BY id")]
+        conn.close()
+        self.assertEqual(messages, ["first", '{"qty":1}', "second"])
+
+class StubMarketsExchange:
+    # Records whether markets were downloaded or restored from the cache
+    def __init__(self):
+        self.markets = None
+        self.currencies = None
+        self.loaded = 0
+
+    def load_markets(self):
+        self.loaded += 1
+        self.markets = {"BTC/USDT": {"symbol": "BTC/USDT", "base": "BTC"}}
+        self.currencies = {"BTC": {"code": "BTC"}}
+        return self.markets
+
+    def set_markets(self, markets, currencies=None):
+        self.markets = markets
+        self.currencies = currencies
+
+class TestMarketsCache(unittest.TestCase):
+    # Runs offline against a stub exchange and a temporary cache directory
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.logger = Logger(db_path=os.path.join(self.tmp_dir, "logs.db"))
+
+    def tearDown(self):
+        self.logger.close()
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def test_cached_markets_are_restored(self):
+        _load_markets("stub_restore", StubMarketsExchange(), self.logger, self.tmp_dir)
+        exchange = StubMarketsExchange()
+        _load_markets("stub_restore", exchange, self.logger, self.tmp_dir)
+        self.assertEqual(exchange.loaded, 0)
+        self.assertIn("BTC/USDT", exchange.markets)
+
+    def test_malformed_cache_file_falls_back_to_load(self):
+        with open(os.path.join(self.tmp_dir, "markets_stub_malformed.json"), "w") as file:
+            json.dump({"markets": {}}, file)
+        exchange = StubMarketsExchange()
+        _load_markets("stub_malformed", exchange, self.logger, self.tmp_dir)
+        self.assertEqual(exchange.loaded, 1)
+        self.assertIn("BTC/USDT", exchange.markets)
+
+class TestHistoricalData(unittest.TestCase):
+    # Runs offline on hand-built candles and stub exchanges
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def test_empty_frame_matches_non_empty_dtypes(self):
+        candles = [[1700000000000, 1.0, 2.0, 0.5, 1.5, 10.0]]
+        full = _ohlcv_to_dataframe(candles, 1800000000000)
+        empty = _ohlcv_to_dataframe([], 0)
+        self.assertEqual(len(full), 1)
+        self.assertTrue(empty.empty)
+        self.assertEqual(list(empty.columns), list(full.columns))
+        self.assertEqual(empty.dtypes.to_dict(), full.dtypes.to_dict())
+
+    def make_listener(self, exchange_id, exchange, logger):
+        # Skip the network market load; the stub replaces the ccxt instance
+        with offline_markets(exchange_id):
+            listener = BaseListener(exchange_id=exchange_id, crypto_symbols=["BTC/USDT"], logger=logger, cache_dir=self.tmp_dir)
+        listener.exchange = exchange
+        return listener
+
+    def test_cache_is_separate_per_exchange(self):
+        logger = Logger(db_path=os.path.join(self.tmp_dir, "logs.db"))
+        first = StubExchange(utc_ms(2023, 1, 1), utc_ms(2023, 12, 31), close=100.0)
+        second = StubExchange(utc_ms(2023, 1, 1), utc_ms(2023, 12, 31), close=999.0)
+        start = datetime(2023, 6, 1, tzinfo=timezone.utc)
+        end = datetime(2023, 6, 10, tzinfo=timezone.utc)
+        try:
+            self.make_listener("binance", first, logger).fetch_historical_data("BTC/USDT", "1h", start, end)
+            data = self.make_listener("kraken", second, logger).fetch_historical_data("BTC/USDT", "1h", start, end)
+        finally:
+            logger.close()
+
+        self.assertTrue(second.calls, "Second exchange was served from the first exchange's cache")
+        self.assertTrue((data["close"] == 999.0).all())
+
+    def test_unusable_cache_dir_falls_back_to_network(self):
+        logger = Logger(db_path=os.path.join(self.tmp_dir, "logs.db"))
+        # A file where the cache directory should be makes every cache write fail
+        blocked_dir = os.path.join(self.tmp_dir, "blocked")
+        open(blocked_dir, "w").close()
+        exchange = StubExchange(utc_ms(2023, 1, 1), utc_ms(2023, 12, 31))
+        with offline_markets("binance"):
+            listener = BaseListener(exchange_id="binance", crypto_symbols=["BTC/USDT"], logger=logger, cache_dir=blocked_dir)
+        listener.exchange = exchange
+        try:
+            data = listener.fetch_historical_data("BTC/USDT", "1h", datetime(2023, 6, 1, tzinfo=timezone.utc), datetime(2023, 6, 2, tzinfo=timezone.utc))
+        finally:
+            logger.close()
+        self.assertEqual(len(data), 24)
+
+    def test_cache_fetches_only_missing_gaps(self):
+        logger = Logger(db_path=os.path.join(self.tmp_dir, "logs.db"))
+        exchange = StubExchange(utc_ms(2023, 1, 1), utc_ms(2023, 12, 31), max_limit=1000)
+        listener = self.make_listener("binance", exchange, logger)
+        try:
+            data = listener.fetch_historical_data("BTC/USDT", "1h", datetime(2023, 6, 1, tzinfo=timezone.utc), datetime(2023, 7, 1, tzinfo=timezone.utc))
+            self.assertEqual(len(data), 30 * 24)
+
+            # Fully cached range: no requests
+            exchange.calls.clear()
+            data = listener.fetch_historical_data("BTC/USDT", "1h", datetime(2023, 6, 5, tzinfo=timezone.utc), datetime(2023, 6, 20, tzinfo=timezone.utc))
+            self.assertEqual(exchange.calls, [])
+            self.assertEqual(len(data), 15 * 24)
+
+            # Wider range: only the front gap and the back gap are requested
+            exchange.calls.clear()
+            data = listener.fetch_historical_data("BTC/USDT", "1h", datetime(2023, 5, 1, tzinfo=timezone.utc), datetime(2023, 8, 1, tzinfo=timezone.utc))
+            # The first 1000-candle page already cached everything before Jun 1 + 1000h
+            self.assertEqual(exchange.calls, [utc_ms(2023, 5, 1), utc_ms(2023, 6, 1) + 1000 * HOUR_MS])
+            self.assertEqual(len(data), 92 * 24)
+            self.assertEqual(data["timestamp"].diff().dropna().nunique(), 1, "Candles are not contiguous")
+        finally:
+            logger.close()
+
+    def test_async_pages_capped_below_limit_are_completed(self):
+        start = datetime(2023, 1, 1, tzinfo=timezone.utc)
+        end = datetime(2023, 3, 1, tzinfo=timezone.utc)
+        logger = Logger(db_path=os.path.join(self.tmp_dir, "logs.db"))
+        listener = AsyncListener(exchange_id="binance", crypto_symbols=["BTC/USDT"], logger=logger)
+        # Exchange caps pages at 300 although 500 candles are requested
+        listener.exchange = AsyncStubExchange(utc_ms(2022, 1, 1), utc_ms(2024, 1, 1), max_limit=300)
+        try:
+            data = asyncio.run(listener.fetch_historical_data("BTC/USDT", "1h", start, end))
+        finally:
+            logger.close()
+
+        expected_hours = (utc_ms(2023, 3, 1) - utc_ms(2023, 1, 1)) // HOUR_MS
+        self.assertEqual(len(data), expected_hours)
+        self.assertEqual(data["timestamp"].diff().dropna().nunique(), 1, "Candles are not contiguous")
+
+class TestOrderManager(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.logger = Logger(db_path=os.path.join(self.tmp_dir, "logs.db"))
+
+    def tearDown(self):
+        self.logger.close()
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def test_base_order_manager_is_abstract(self):
+        with self.assertRaises(TypeError):
+            BaseOrderManager("binance", APIKey(key="", secret=""), self.logger)
+
+    def test_factory_returns_ccxt_backend(self):
+        with offline_markets("kraken"):
+            manager = AlpacaOrderManager("kraken", APIKey(key="", secret=""), self.logger)
+        self.assertIsInstance(manager, CcxtBackendManager)
+        self.assertIsInstance(manager, BaseOrderManager)
+
+    def test_ccxt_orders_without_batch_endpoint_run_on_caller_thread(self):
+        with offline_markets("kraken"):
+            manager = AlpacaOrderManager("kraken", APIKey(key="", secret=""), self.logger)
+        threads = []
+        manager.api = mock.Mock(has={})
+        with mock.patch.object(manager, "create_order", side_effect=lambda **order: threads.append(threading.get_ident())):
+            manager.create_orders([{"symbol": "BTC/USD", "order_type": OrderType.MARKET, "side": "buy", "qty": 1}] * 4)
+        self.assertEqual(threads, [threading.get_ident()] * 4)
+
+    def test_ccxt_exit_positions_sells_a_shared_base_once(self):
+        with offline_markets("kraken"):
+            manager = AlpacaOrderManager("kraken", APIKey(key="", secret=""), self.logger)
+        manager.api = mock.Mock()
+        manager.api.fetch_balance.return_value = {"BTC": {"free": 1.5}}
+        manager._base_of = {"BTC/USDT": "BTC", "BTC/USDC": "BTC"}
+        results = manager.exit_positions(["BTC/USDT", "BTC/USDC"])
+        manager.api.create_market_sell_order.assert_called_once_with("BTC/USDT", 1.5)
+        self.assertIsNone(results["BTC/USDC"])
+
+class StubTickerExchange:
+    has = {"fetchTickers": True}
+
+    def fetch_tickers(self, symbols):
+        return {symbol: {"last": 1.0} for symbol in symbols}
+
+class StubStreamExchange:
+    # Pushes one round of tickers, then cancels the watch
+    has = {"watchTickers": True}
+
+    def __init__(self):
+        self.rounds = 0
+
+    async def watch_tickers(self, symbols):
+        self.rounds += 1
+        if self.rounds > 1:
+            raise asyncio.CancelledError
+        return {symbol: {"last": 2.0} for symbol in symbols}
+
+class TestStreamingListener(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.logger = Logger(db_path=os.path.join(self.tmp_dir, "logs.db"))
+
+    def tearDown(self):
+        self.logger.close()
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def test_streamed_tickers_reach_the_callback(self):
+        with offline_markets("binance"):
+            listener = StreamingListener(exchange_id="binance", crypto_symbols=["BTC/USDT", "ETH/USDT"], logger=self.logger, cache_dir=self.tmp_dir)
+        listener.stream_exchange = StubStreamExchange()
+        received = []
+        with self.assertRaises(asyncio.CancelledError):
+            asyncio.run(listener.listen_to_prices(received.append))
+        self.assertEqual(received, [CryptoPrice(symbol="BTC/USDT", price=2.0), CryptoPrice(symbol="ETH/USDT", price=2.0)])
+
+    def test_stream_exchange_reuses_loaded_markets(self):
+        market = {"id": "BTCUSDT", "symbol": "BTC/USDT", "base": "BTC", "quote": "USDT", "baseId": "BTC", "quoteId": "USDT", "precision": {}, "limits": {}, "spot": True, "type": "spot"}
+        entry = {"fetched_at": time.time(), "markets": {"BTC/USDT": market}, "currencies": None}
+        # A fresh exchange instance, so the stub market does not leak into the shared cached one
+        with mock.patch.dict(crypto_kit._MARKETS_CACHE, {"binance": entry}), \
+                mock.patch.dict(crypto_kit._EXCHANGE_INSTANCE_CACHE, clear=True):
+            listener = StreamingListener(exchange_id="binance", crypto_symbols=["BTC/USDT"], logger=self.logger, cache_dir=self.tmp_dir)
+        self.assertEqual(list(listener.stream_exchange.markets), ["BTC/USDT"])
+
+    def test_polls_when_streaming_is_unsupported(self):
+        with offline_markets("binance"):
+            listener = StreamingListener(exchange_id="binance", crypto_symbols=["BTC/USDT"], logger=self.logger, cache_dir=self.tmp_dir)
+        listener.exchange = StubTickerExchange()
+        listener.stream_exchange = None
+        received = []
+        # Stop the poll loop after its first round
+        with mock.patch("Crypto.crypto_kit.asyncio.sleep", side_effect=asyncio.CancelledError):
+            with self.assertRaises(asyncio.CancelledError):
+                asyncio.run(listener.listen_to_prices(received.append))
+        self.assertEqual(received, [CryptoPrice(symbol="BTC/USDT", price=1.0)])
+
 if __name__ == "__main__":
     unittest.main()